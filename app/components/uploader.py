@@ -1,19 +1,81 @@
 import streamlit as st
 from pathlib import Path
+import io
 import uuid
+import shutil
+import hashlib
+import functools
 import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Tuple
+import mutagen.flac
+import mutagen.mp3
+import mutagen.mp4
+import mutagen.oggvorbis
+import mutagen.wave
 from config.settings import (
     UPLOAD_DIR, MAX_FILE_SIZE_MB, 
     MAX_DURATION_SECONDS, ALLOWED_AUDIO_FORMATS
 )
+from database.db_manager import get_db
 
-def validate_audio_file(uploaded_file) -> Tuple[bool, Optional[str]]:
+# Read/write buffer size for streaming uploads to disk
+CHUNK_SIZE = 1 << 20  # 1 MB
+
+# Bytes hashed to recognise the same upload across reruns and sessions
+FINGERPRINT_SIZE = 1 << 20  # 1 MiB
+
+# Container signatures as (offset, bytes); any match accepts the file.
+# mp3 frame syncs cover MPEG-1, MPEG-2 and MPEG-2.5 Layer III
+_MAGICS = {
+    'mp3': (
+        (0, b'ID3'),
+        (0, b'\xff\xfb'), (0, b'\xff\xfa'),  # MPEG-1
+        (0, b'\xff\xf3'), (0, b'\xff\xf2'),  # MPEG-2
+        (0, b'\xff\xe3'), (0, b'\xff\xe2'),  # MPEG-2.5
+    ),
+    'wav': ((0, b'RIFF'),),
+    'flac': ((0, b'fLaC'),),
+    'ogg': ((0, b'OggS'),),
+    'm4a': ((4, b'ftyp'),),
+}
+MAGIC_SIZE = 12
+
+# In-process container header parsers, tried before falling back to ffprobe
+_HEADER_READERS = {
+    'mp3': mutagen.mp3.MP3,
+    'flac': mutagen.flac.FLAC,
+    'ogg': mutagen.oggvorbis.OggVorbis,
+    'm4a': mutagen.mp4.MP4,
+    'wav': mutagen.wave.WAVE,
+}
+
+# Containers whose demuxer must seek, so ffprobe can't read them from a pipe
+_SEEKING_FORMATS = {'m4a', 'mp4'}
+
+# ffprobe resolved once on import rather than by a PATH walk per call;
+# None when it isn't installed, so the fallback is skipped outright
+FFPROBE = shutil.which("ffprobe")
+
+# Background workers so duration probing overlaps with UI rendering
+_PROBE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="duration-probe")
+
+
+def _ext(name: str) -> str:
+    """Lower-cased file extension without the dot, or "" if there is none"""
+    return Path(name).suffix.lstrip('.').lower()
+
+
+def validate_audio_file(
+    uploaded_file,
+    file_ext: Optional[str] = None
+) -> Tuple[bool, Optional[str]]:
     """
     Validate uploaded audio file
     
     Args:
         uploaded_file: Streamlit UploadedFile object
+        file_ext: File extension, derived from the name if not given
     
     Returns:
         (is_valid, error_message)
@@ -23,7 +85,8 @@ def validate_audio_file(uploaded_file) -> Tuple[bool, Optional[str]]:
         return False, "No file uploaded"
     
     # Check file extension
-    file_ext = uploaded_file.name.split('.')[-1].lower()
+    if file_ext is None:
+        file_ext = _ext(uploaded_file.name)
     if file_ext not in ALLOWED_AUDIO_FORMATS:
         return False, f"Invalid format. Allowed: {', '.join(ALLOWED_AUDIO_FORMATS)}"
     
@@ -32,94 +95,306 @@ def validate_audio_file(uploaded_file) -> Tuple[bool, Optional[str]]:
     if file_size_mb > MAX_FILE_SIZE_MB:
         return False, f"File too large ({file_size_mb:.1f}MB). Max: {MAX_FILE_SIZE_MB}MB"
     
+    # Check content matches the extension, before anything is written.
+    # Allowed formats without a known signature pass on extension alone
+    magics = _MAGICS.get(file_ext, ())
+    if magics:
+        head = uploaded_file.read(MAGIC_SIZE)
+        uploaded_file.seek(0)
+        if not any(head.startswith(magic, offset) for offset, magic in magics):
+            return False, f"File content doesn't look like {file_ext.upper()} audio"
+    
     return True, None
 
 
-def get_audio_duration(file_bytes, file_ext: str) -> Optional[float]:
+def _header_duration(source, file_ext: str) -> Optional[float]:
     """
-    Get duration of audio file using ffprobe
+    Read duration from the container header without spawning ffprobe
     
     Args:
-        file_bytes: Audio file bytes
+        source: File path or seekable file-like object
         file_ext: File extension
     
     Returns:
-        Duration in seconds or None if error
+        Duration in seconds or None if the header can't be parsed
     """
+    reader = _HEADER_READERS.get(file_ext)
+    if reader is None:
+        return None
+    
     try:
-        # Save temporarily
-        temp_path = UPLOAD_DIR / f"temp_{uuid.uuid4()}.{file_ext}"
-        with open(temp_path, 'wb') as f:
-            f.write(file_bytes)
-        
-        # Get duration using ffprobe directly
+        return reader(source).info.length or None
+    except Exception:
+        return None
+
+
+def _run_ffprobe(source: str, input_bytes: Optional[bytes] = None) -> Optional[float]:
+    """
+    Run ffprobe and parse the reported duration
+    
+    Args:
+        source: Path to audio file, or "pipe:0" to read input_bytes from stdin
+        input_bytes: Audio bytes piped to ffprobe when source is "pipe:0"
+    
+    Returns:
+        Duration in seconds or None if ffprobe fails or isn't installed
+    """
+    if FFPROBE is None:
+        return None
+    
+    # Some containers only carry duration on the stream, not the format
+    for entries in ("format=duration", "stream=duration"):
         cmd = [
-            "ffprobe", 
+            FFPROBE, 
             "-v", "error", 
-            "-show_entries", "format=duration", 
+            "-probesize", "32k",
+            "-analyzeduration", "0",
+            "-fflags", "+fastseek",
+            "-show_entries", entries, 
             "-of", "default=noprint_wrappers=1:nokey=1", 
-            str(temp_path)
+            "-i", source
         ]
         
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-        duration = float(result.stdout.strip())
-        
-        # Clean up
-        temp_path.unlink()
+        try:
+            result = subprocess.run(cmd, input=input_bytes, capture_output=True, check=True)
+        except subprocess.CalledProcessError:
+            # If ffprobe fails, we might just proceed without duration or log warning
+            return None
         
+        # Raw bytes: float() parses ASCII digits without a decode pass.
+        # Output is empty or "N/A" when this entry isn't set
+        for value in result.stdout.split():
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    
+    return None
+
+
+@functools.lru_cache(maxsize=128)
+def _ffprobe_duration(path_str: str, size: int, mtime_ns: int) -> Optional[float]:
+    """
+    Run ffprobe on a file, memoized per file version
+    
+    Args:
+        path_str: Path to audio file
+        size: File size in bytes (cache key only)
+        mtime_ns: File modification time in ns (cache key only)
+    
+    Returns:
+        Duration in seconds or None if ffprobe fails
+    """
+    return _run_ffprobe(path_str)
+
+
+def _probe_duration(file_path: Path, file_ext: str) -> Optional[float]:
+    """
+    Probe duration of a file on disk, header first then ffprobe
+    
+    Safe to run off the Streamlit script thread: unexpected errors are
+    raised to the caller instead of being rendered.
+    
+    Args:
+        file_path: Path to audio file
+        file_ext: File extension
+    
+    Returns:
+        Duration in seconds or None if it can't be determined
+    """
+    duration = _header_duration(file_path, file_ext)
+    if duration is not None:
         return duration
     
-    except subprocess.CalledProcessError:
-        # If ffprobe fails, we might just proceed without duration or log warning
-        # st.warning("Could not determine duration via ffprobe.")
-        if temp_path.exists():
-            temp_path.unlink()
+    stat = Path(file_path).stat()
+    return _ffprobe_duration(str(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def get_audio_duration_path(file_path: Path, file_ext: str) -> Optional[float]:
+    """
+    Get duration of an audio file already on disk
+    
+    Parses the container header in-process and only falls back to
+    ffprobe when that fails.
+    
+    Args:
+        file_path: Path to audio file
+        file_ext: File extension
+    
+    Returns:
+        Duration in seconds or None if error
+    """
+    try:
+        return _probe_duration(file_path, file_ext)
+    
+    except Exception as e:
+        st.warning(f"Could not determine audio duration: {e}")
         return None
+
+
+def probe_audio_duration_async(file_path: Path, file_ext: str) -> Future:
+    """
+    Start reading duration of a file on disk in the background
+    
+    The container header is parsed first; files it can't read (e.g.
+    Opus in .ogg) fall back to ffprobe on the worker thread, so the
+    duration limit is still enforced for them.
+    
+    Args:
+        file_path: Path to audio file
+        file_ext: File extension
+    
+    Returns:
+        Future resolving to duration in seconds or None
+    """
+    return _PROBE_EXECUTOR.submit(_probe_duration, file_path, file_ext)
+
+
+def resolve_audio_duration(duration_future: Future, file_path: str) -> Optional[float]:
+    """
+    Wait for a background duration probe and enforce the duration limit
+    
+    Args:
+        duration_future: Future returned by save_uploaded_file
+        file_path: Path of the saved upload, removed if too long
+    
+    Returns:
+        Duration in seconds or None if unknown
+    
+    Raises:
+        ValueError: If the audio exceeds MAX_DURATION_SECONDS
+    """
+    try:
+        duration = duration_future.result()
     except Exception as e:
         st.warning(f"Could not determine audio duration: {e}")
-        if 'temp_path' in locals() and temp_path.exists():
+        duration = None
+    
+    # Validate duration
+    if duration and duration > MAX_DURATION_SECONDS:
+        Path(file_path).unlink(missing_ok=True)
+        raise ValueError(
+            f"Audio too long ({duration/60:.1f} min). "
+            f"Max: {MAX_DURATION_SECONDS/60:.0f} min"
+        )
+    
+    return duration
+
+
+def get_audio_duration(file_bytes, file_ext: str) -> Optional[float]:
+    """
+    Get duration of in-memory audio bytes
+    
+    Args:
+        file_bytes: Audio file bytes
+        file_ext: File extension
+    
+    Returns:
+        Duration in seconds or None if error
+    """
+    duration = _header_duration(io.BytesIO(file_bytes), file_ext)
+    if duration is not None:
+        return duration
+    
+    # Pipe the bytes to ffprobe unless the demuxer needs to seek
+    if file_ext not in _SEEKING_FORMATS:
+        try:
+            return _run_ffprobe("pipe:0", file_bytes)
+        except Exception as e:
+            st.warning(f"Could not determine audio duration: {e}")
+            return None
+    
+    temp_path = UPLOAD_DIR / f"temp_{uuid.uuid4().hex}.{file_ext}"
+    try:
+        # Save temporarily
+        with open(temp_path, 'wb') as f:
+            f.write(file_bytes)
+        
+        return get_audio_duration_path(temp_path, file_ext)
+    
+    finally:
+        # Clean up
+        if temp_path.exists():
             temp_path.unlink()
-        return None
 
 
-def save_uploaded_file(uploaded_file) -> Tuple[str, str, float]:
+def _upload_fingerprint(uploaded_file) -> Tuple[int, str]:
+    """
+    Identify an upload by its size and a hash of its first MiB
+    
+    Args:
+        uploaded_file: Streamlit UploadedFile object
+    
+    Returns:
+        (size, sha256 hex digest) tuple usable as a cache key
+    """
+    head = uploaded_file.read(FINGERPRINT_SIZE)
+    uploaded_file.seek(0)
+    return uploaded_file.size, hashlib.sha256(head).hexdigest()
+
+
+def _completed(value) -> Future:
+    """Wrap an already known value in a finished Future"""
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def save_uploaded_file(
+    uploaded_file,
+    file_ext: Optional[str] = None
+) -> Tuple[str, str, Future, str]:
     """
     Save uploaded file to disk
     
+    The duration probe runs in the background; pass the returned future
+    to resolve_audio_duration() where the duration is first needed.
+    
     Args:
         uploaded_file: Streamlit UploadedFile object
+        file_ext: File extension, derived from the name if not given
     
     Returns:
-        (podcast_id, file_path, duration)
+        (podcast_id, file_path, duration_future, content_hash)
     """
     # Generate unique ID
-    podcast_id = str(uuid.uuid4())
+    podcast_id = uuid.uuid4().hex
     
     # Get file extension
-    file_ext = uploaded_file.name.split('.')[-1].lower()
+    if file_ext is None:
+        file_ext = _ext(uploaded_file.name)
     
     # Create filename
     filename = f"podcast_{podcast_id}.{file_ext}"
     file_path = UPLOAD_DIR / filename
     
-    # Read file bytes
-    file_bytes = uploaded_file.read()
-    
-    # Get duration before saving
-    duration = get_audio_duration(file_bytes, file_ext)
-    
-    # Validate duration
-    if duration and duration > MAX_DURATION_SECONDS:
-        raise ValueError(
-            f"Audio too long ({duration/60:.1f} min). "
-            f"Max: {MAX_DURATION_SECONDS/60:.0f} min"
-        )
+    # Reuse a duration probed earlier for the same upload
+    duration_cache = st.session_state.setdefault('audio_durations', {})
+    fingerprint = _upload_fingerprint(uploaded_file)
+    file_size, content_hash = fingerprint
     
-    # Save file
+    # Stream upload to disk once, in chunks, so peak memory stays O(chunk)
+    uploaded_file.seek(0)
     with open(file_path, 'wb') as f:
-        f.write(file_bytes)
+        shutil.copyfileobj(uploaded_file, f, length=CHUNK_SIZE)
+    
+    # Get duration: this session first, then the DB, then the saved file
+    if fingerprint in duration_cache:
+        duration_future = _completed(duration_cache[fingerprint])
+    elif (known := get_db().get_duration_by_content_hash(content_hash, file_size)) is not None:
+        duration_cache[fingerprint] = known
+        duration_future = _completed(known)
+    else:
+        duration_future = probe_audio_duration_async(file_path, file_ext)
+        
+        # Don't cache a miss: the DB may learn the duration from the transcript
+        def _remember(done: Future):
+            if done.exception() is None and done.result() is not None:
+                duration_cache[fingerprint] = done.result()
+        
+        duration_future.add_done_callback(_remember)
     
-    return podcast_id, str(file_path), duration
+    return podcast_id, str(file_path), duration_future, content_hash
 
 
 def render_upload_section():
@@ -127,7 +402,7 @@ def render_upload_section():
     Render the file upload section
     
     Returns:
-        (uploaded_file, podcast_id, file_path, duration) if file uploaded, else None
+        (uploaded_file, podcast_id, file_path, duration, content_hash) if file uploaded, else None
     """
     st.header("📤 Upload Podcast")
     
@@ -144,7 +419,8 @@ def render_upload_section():
         st.info(f"📁 **{uploaded_file.name}** ({file_size_mb:.2f} MB)")
         
         # Validate
-        is_valid, error_msg = validate_audio_file(uploaded_file)
+        file_ext = _ext(uploaded_file.name)
+        is_valid, error_msg = validate_audio_file(uploaded_file, file_ext)
         
         if not is_valid:
             st.error(f"❌ {error_msg}")
@@ -154,21 +430,22 @@ def render_upload_section():
         if st.button("✅ Process This Podcast", type="primary"):
             with st.spinner("Saving file..."):
                 try:
-                    podcast_id, file_path, duration = save_uploaded_file(uploaded_file)
+                    podcast_id, file_path, duration_future, content_hash = save_uploaded_file(uploaded_file, file_ext)
                     
-                    st.success("✓ File uploaded successfully!")
-                    
-                    # Display details
+                    # Display details while the duration probe finishes
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Podcast ID", podcast_id[:8] + "...")
+                        st.metric("Podcast ID", podcast_id[:8])
                     with col2:
                         st.metric("File Size", f"{file_size_mb:.2f} MB")
                     with col3:
+                        duration = resolve_audio_duration(duration_future, file_path)
                         if duration:
                             st.metric("Duration", f"{duration/60:.1f} min")
                     
-                    return uploaded_file, podcast_id, file_path, duration
+                    st.success("✓ File uploaded successfully!")
+                    
+                    return uploaded_file, podcast_id, file_path, duration, content_hash
                 
                 except Exception as e:
                     st.error(f"❌ Error: {e}")
@@ -1,8 +1,14 @@
 import streamlit as st
+import os
 import time
-import json
+import orjson
+import numpy as np
+import plotly.io as pio
 from pathlib import Path
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 
 # Add project root to path
@@ -10,20 +16,9 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 # Imports
-from config.settings import APP_TITLE, APP_ICON, PAGE_LAYOUT, RESULTS_DIR
+from config.settings import APP_TITLE, APP_ICON, PAGE_LAYOUT, RESULTS_DIR, ensure_dirs
 from app.components.uploader import render_upload_section
-from models.transcriber import get_transcriber
-from models.analyzer import get_analyzer
-from models.sentiment_analyzer import SentimentAnalyzer
-from models.tone_detector import ToneDetector
 from database.db_manager import get_db
-from utils.visualizations import (
-    create_sentiment_timeline,
-    create_sentiment_distribution_pie,
-    create_tone_heatmap,
-    create_combined_dashboard
-)
-from utils.pdf_generator import generate_pdf_report
 
 
 # Page config
@@ -33,8 +28,174 @@ st.set_page_config(
     layout=PAGE_LAYOUT
 )
 
+# Serialize figures for st.plotly_chart with orjson (numpy-aware, much
+# faster than stdlib json); orjson is already a hard dependency here
+pio.json.config.default_engine = 'orjson'
+
+
+# Transcript highlight colours by sentiment label; other labels are transparent
+_HIGHLIGHT_RGB = {
+    "positive": "46,204,113",
+    "negative": "231,76,60"
+}
+
+
+# Model loaders: imported lazily so upload/sidebar reruns don't pull in
+# torch/transformers, and cached so weights load once per process
+@st.cache_resource(show_spinner=False)
+def _load_transcriber():
+    from models.transcriber import get_transcriber
+    return get_transcriber()
+
+
+@st.cache_resource(show_spinner=False)
+def _load_analyzer():
+    from models.analyzer import get_analyzer
+    return get_analyzer()
+
+
+@st.cache_resource(show_spinner=False)
+def _load_sentiment_analyzer():
+    from models.sentiment_analyzer import SentimentAnalyzer
+    return SentimentAnalyzer()
+
+
+@st.cache_resource(show_spinner=False)
+def _load_tone_detector():
+    from models.tone_detector import ToneDetector
+    return ToneDetector()
+
+
+# Overlapping sessions share torch's process-wide thread count: the first
+# to enter saves and splits it, the last to leave restores it
+_torch_threads_lock = threading.Lock()
+_torch_threads_active = 0
+_torch_threads_saved = None
+
+
+@contextmanager
+def _shared_torch_threads(concurrent_tasks: int):
+    """Split torch's intra-op threads between models running side by side"""
+    global _torch_threads_active, _torch_threads_saved
+    torch = sys.modules.get("torch")
+    if torch is None:
+        yield
+        return
+
+    with _torch_threads_lock:
+        if _torch_threads_active == 0:
+            _torch_threads_saved = torch.get_num_threads()
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // concurrent_tasks))
+        _torch_threads_active += 1
+    try:
+        yield
+    finally:
+        with _torch_threads_lock:
+            _torch_threads_active -= 1
+            if _torch_threads_active == 0:
+                torch.set_num_threads(_torch_threads_saved)
+
+
+# Sidebar stats: a few seconds stale is fine, and saves an aggregate
+# query on every rerun
+@st.cache_data(ttl=30, show_spinner=False)
+def _statistics():
+    return get_db().get_statistics()
+
+
+# Report and figure caches hold a full transcript, PDF or figure each, so
+# keep only recent podcasts and let idle entries expire
+REPORT_CACHE_ENTRIES = 16
+REPORT_CACHE_TTL = 3600  # seconds
+
+
+def _orjson_default(obj):
+    """Fallback for values orjson can't encode natively, e.g. numpy string arrays"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+# Built once per podcast: the underscored results aren't hashed, so reruns
+# don't pay to hash or re-encode the full transcript
+@st.cache_data(show_spinner=False, max_entries=REPORT_CACHE_ENTRIES, ttl=REPORT_CACHE_TTL)
+def _json_report_bytes(podcast_id, filename, _transcript_result, _sentiment_results, _tone_results):
+    json_report = {
+        "podcast_id": podcast_id,
+        "filename": filename,
+        "transcript": _transcript_result,
+        "sentiment": _sentiment_results,
+        "tone": _tone_results,
+        "analysis_date": datetime.now().isoformat()
+    }
+    return orjson.dumps(
+        json_report,
+        default=_orjson_default,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=REPORT_CACHE_ENTRIES, ttl=REPORT_CACHE_TTL)
+def _pdf_report_bytes(podcast_id, filename, _transcript_result, _sentiment_results, _tone_results):
+    from utils.pdf_generator import generate_pdf_report
+    return generate_pdf_report(
+        podcast_id=podcast_id,
+        filename=filename,
+        transcript_data=_transcript_result,
+        sentiment_results=_sentiment_results,
+        tone_results=_tone_results
+    )
+
+
+def _hash_results(results: dict) -> bytes:
+    """Content hash for result dicts; keys are sorted so insertion order doesn't matter"""
+    return orjson.dumps(
+        results,
+        default=_orjson_default,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+# Plot builders: cached on their inputs so reruns reuse the figures
+@st.cache_data(
+    show_spinner=False, hash_funcs={dict: _hash_results},
+    max_entries=REPORT_CACHE_ENTRIES, ttl=REPORT_CACHE_TTL
+)
+def _cached_combined_dashboard(sentiment_results, tone_results):
+    from utils.visualizations import create_combined_dashboard
+    return create_combined_dashboard(sentiment_results, tone_results)
+
+
+@st.cache_data(
+    show_spinner=False, hash_funcs={dict: _hash_results},
+    max_entries=REPORT_CACHE_ENTRIES, ttl=REPORT_CACHE_TTL
+)
+def _cached_sentiment_timeline(timeline_data):
+    from utils.visualizations import create_sentiment_timeline
+    return create_sentiment_timeline(timeline_data)
+
+
+@st.cache_data(
+    show_spinner=False, hash_funcs={dict: _hash_results},
+    max_entries=REPORT_CACHE_ENTRIES, ttl=REPORT_CACHE_TTL
+)
+def _cached_sentiment_pie(sentiment_results):
+    from utils.visualizations import create_sentiment_distribution_pie
+    return create_sentiment_distribution_pie(sentiment_results)
+
+
+@st.cache_data(
+    show_spinner=False, hash_funcs={dict: _hash_results},
+    max_entries=REPORT_CACHE_ENTRIES, ttl=REPORT_CACHE_TTL
+)
+def _cached_tone_heatmap(tone_timeline):
+    from utils.visualizations import create_tone_heatmap
+    return create_tone_heatmap(tone_timeline)
+
 
 def main():
+    ensure_dirs()
+
     st.title(f"{APP_ICON} {APP_TITLE}")
     st.markdown("Upload a podcast episode to detect bias, sentiment, and tone.")
 
@@ -49,7 +210,7 @@ def main():
 """)
 
         db = get_db()
-        stats = db.get_statistics()
+        stats = _statistics()
         st.metric("Podcasts Analyzed", stats['total_podcasts'])
         st.metric("Avg Bias Score", stats['avg_bias_score'])
 
@@ -57,7 +218,7 @@ def main():
     if 'current_podcast' not in st.session_state:
         upload_result = render_upload_section()
         if upload_result:
-            uploaded_file, podcast_id, file_path, duration = upload_result
+            uploaded_file, podcast_id, file_path, duration, content_hash = upload_result
 
             st.session_state['current_podcast'] = {
                 'id': podcast_id,
@@ -72,7 +233,8 @@ def main():
                 uploaded_file.name,
                 uploaded_file.size,
                 file_path,
-                duration
+                duration,
+                content_hash
             )
             st.rerun()
 
@@ -91,63 +253,75 @@ def main():
             status.text("🎙️ Transcribing audio...")
             progress_bar.progress(10)
 
-            transcriber = get_transcriber()
+            transcriber = _load_transcriber()
             processed = transcriber.preprocess_audio(podcast['path'])
             transcript_result = transcriber.transcribe(processed)
 
-            transcript_path = Path(podcast['path']).with_suffix(".json")
-            transcriber.save_transcript(transcript_result, str(transcript_path))
             full_text = transcript_result["text"]
+            segments = transcript_result.get("segments")
 
-            progress_bar.progress(40)
-
-            # -----------------------------
-            # STEP 2 — SENTIMENT
-            # -----------------------------
-            sentiment_model = SentimentAnalyzer()
-            sentiment_results = sentiment_model.analyze_text(
-                full_text,
-                transcript_result.get("segments")
-            )
-
-            sentiment_path = Path(RESULTS_DIR) / f"{podcast['id']}_sentiment.json"
-            sentiment_model.save_results(sentiment_results, str(sentiment_path))
-            progress_bar.progress(60)
+            # The last segment ends where the audio does; prefer it over the
+            # upload-time probe, which may have been skipped
+            duration = segments[-1]["end"] if segments else podcast.get("duration")
+            transcript_result.setdefault("duration", duration)
+            podcast['duration'] = duration
 
-            # -----------------------------
-            # STEP 3 — TONE
-            # -----------------------------
-            tone_detector = ToneDetector()
-            tone_results = tone_detector.analyze_text(
-                full_text,
-                transcript_result.get("segments")
-            )
+            # Saved after the duration is set, so the file matches the report
+            transcript_path = Path(podcast['path']).with_suffix(".json")
+            transcriber.save_transcript(transcript_result, str(transcript_path))
 
-            tone_path = Path(RESULTS_DIR) / f"{podcast['id']}_tone.json"
-            tone_detector.save_results(tone_results, str(tone_path))
-            progress_bar.progress(75)
+            progress_bar.progress(40)
 
             # -----------------------------
-            # STEP 4 — BIAS
+            # STEPS 2-4 — SENTIMENT, TONE, BIAS
             # -----------------------------
-            analyzer = get_analyzer()
-            bias = analyzer.analyze_bias(full_text)
-            progress_bar.progress(90)
+            # All three only read the transcript, so run them concurrently
+            sentiment_model = _load_sentiment_analyzer()
+            tone_detector = _load_tone_detector()
+            analyzer = _load_analyzer()
+
+            with _shared_torch_threads(3), ThreadPoolExecutor(max_workers=3) as executor:
+                sentiment_future = executor.submit(sentiment_model.analyze_text, full_text, segments)
+                tone_future = executor.submit(tone_detector.analyze_text, full_text, segments)
+                bias_future = executor.submit(analyzer.analyze_bias, full_text)
+
+                # STEP 2 — SENTIMENT
+                sentiment_results = sentiment_future.result()
+                sentiment_path = Path(RESULTS_DIR) / f"{podcast['id']}_sentiment.json"
+                sentiment_model.save_results(sentiment_results, str(sentiment_path))
+                progress_bar.progress(60)
+
+                # STEP 3 — TONE
+                tone_results = tone_future.result()
+                tone_path = Path(RESULTS_DIR) / f"{podcast['id']}_tone.json"
+                tone_detector.save_results(tone_results, str(tone_path))
+                progress_bar.progress(75)
+
+                # STEP 4 — BIAS
+                bias = bias_future.result()
+                progress_bar.progress(90)
 
             # -----------------------------
             # STEP 5 — SAVE DB
             # -----------------------------
-            analysis_id = db.insert_analysis(
-                podcast['id'],
-                sentiment_results,
-                tone_results,
-                bias,
-                processing_time=120.0,
-                result_json_path=str(transcript_path)
-            )
+            # One transaction, so the results and final status share a commit
+            with db.transaction():
+                db.save_analysis_with_flags(
+                    podcast['id'],
+                    sentiment_results,
+                    tone_results,
+                    bias,
+                    processing_time=120.0,
+                    result_json_path=str(transcript_path),
+                    flags=bias['flags']
+                )
 
-            if bias['flags']:
-                db.insert_bias_flags(analysis_id, bias['flags'])
+                db.update_podcast_status(
+                    podcast_id=podcast['id'],
+                    status="completed",
+                    transcript_path=str(transcript_path),
+                    duration=duration
+                )
 
             progress_bar.progress(100)
             status.success("Analysis Complete!")
@@ -159,7 +333,7 @@ def main():
             st.write("## 📊 Analysis Dashboard")
 
             try:
-                dashboard_fig = create_combined_dashboard(
+                dashboard_fig = _cached_combined_dashboard(
                     sentiment_results,
                     tone_results
                 )
@@ -173,19 +347,19 @@ def main():
                 with col1:
                     if sentiment_results.get("timeline"):
                         st.plotly_chart(
-                            create_sentiment_timeline(sentiment_results["timeline"]),
+                            _cached_sentiment_timeline(sentiment_results["timeline"]),
                             use_container_width=True
                         )
 
                 with col2:
                     st.plotly_chart(
-                        create_sentiment_distribution_pie(sentiment_results),
+                        _cached_sentiment_pie(sentiment_results),
                         use_container_width=True
                     )
 
                 if tone_results.get("timeline"):
                     st.plotly_chart(
-                        create_tone_heatmap(tone_results["timeline"]),
+                        _cached_tone_heatmap(tone_results["timeline"]),
                         use_container_width=True
                     )
 
@@ -196,19 +370,14 @@ def main():
             st.write("## 📝 Full Transcript with Sentiment Highlights")
 
             if sentiment_results.get("sentences"):
-                html = "<div style='line-height:2;'>"
+                parts = []
+                append = parts.append
                 for s in sentiment_results["sentences"][:50]:
-                    score = abs(s["score"])
-                    if s["label"] == "positive":
-                        color = f"rgba(46,204,113,{score*0.3})"
-                    elif s["label"] == "negative":
-                        color = f"rgba(231,76,60,{score*0.3})"
-                    else:
-                        color = "transparent"
-
-                    html += f"<span style='background:{color};padding:2px 4px;border-radius:3px;'>{s['text']}</span> "
+                    rgb = _HIGHLIGHT_RGB.get(s["label"])
+                    color = f"rgba({rgb},{abs(s['score'])*0.3})" if rgb else "transparent"
+                    append(f"<span style='background:{color};padding:2px 4px;border-radius:3px;'>{s['text']}</span> ")
 
-                html += "</div>"
+                html = "<div style='line-height:2;'>" + "".join(parts) + "</div>"
                 st.markdown(html, unsafe_allow_html=True)
 
             # ==================================================
@@ -221,18 +390,15 @@ def main():
 
             # JSON EXPORT
             with export_col1:
-                json_report = {
-                    "podcast_id": podcast['id'],
-                    "filename": podcast['filename'],
-                    "transcript": transcript_result,
-                    "sentiment": sentiment_results,
-                    "tone": tone_results,
-                    "analysis_date": datetime.now().isoformat()
-                }
-
                 st.download_button(
                     "📄 Download JSON Report",
-                    json.dumps(json_report, indent=2),
+                    _json_report_bytes(
+                        podcast['id'],
+                        podcast['filename'],
+                        transcript_result,
+                        sentiment_results,
+                        tone_results
+                    ),
                     file_name=f"{podcast['id']}_report.json",
                     mime="application/json"
                 )
@@ -242,37 +408,26 @@ def main():
                 if st.button("📑 Generate PDF Report"):
                     with st.spinner("Generating PDF..."):
                         try:
-                            pdf_path = Path(RESULTS_DIR) / f"{podcast['id']}_report.pdf"
-
-                            generate_pdf_report(
-                                podcast_id=podcast['id'],
-                                filename=podcast['filename'],
-                                transcript_data=transcript_result,
-                                sentiment_results=sentiment_results,
-                                tone_results=tone_results,
-                                output_path=str(pdf_path)
+                            pdf_bytes = _pdf_report_bytes(
+                                podcast['id'],
+                                podcast['filename'],
+                                transcript_result,
+                                sentiment_results,
+                                tone_results
                             )
 
-                            with open(pdf_path, "rb") as f:
-                                st.download_button(
-                                    "📥 Download PDF",
-                                    f,
-                                    file_name=f"{podcast['id']}_report.pdf",
-                                    mime="application/pdf"
-                                )
+                            st.download_button(
+                                "📥 Download PDF",
+                                data=pdf_bytes,
+                                file_name=f"{podcast['id']}_report.pdf",
+                                mime="application/pdf"
+                            )
 
                             st.success("✓ PDF generated!")
 
                         except Exception as e:
                             st.error(f"PDF generation failed: {e}")
 
-            # Final DB update
-            db.update_podcast_status(
-                podcast_id=podcast['id'],
-                status="completed",
-                transcript_path=str(transcript_path)
-            )
-
             st.success("🎉 Analysis Complete!")
             st.balloons()
 
@@ -1,4 +1,5 @@
 import os
+from functools import cache
 from pathlib import Path
 
 # Project root directory
@@ -9,9 +10,13 @@ UPLOAD_DIR = BASE_DIR / "data" / "uploads"
 TRANSCRIPT_DIR = BASE_DIR / "data" / "transcripts"
 RESULTS_DIR = BASE_DIR / "data" / "results"
 
-# Ensure directories exist
-for directory in [UPLOAD_DIR, TRANSCRIPT_DIR, RESULTS_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+
+@cache
+def ensure_dirs():
+    """Create the data directories once per process, on first call rather than on import"""
+    for directory in (UPLOAD_DIR, TRANSCRIPT_DIR, RESULTS_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
+
 
 # File upload settings
 MAX_FILE_SIZE_MB = 100
@@ -1,10 +1,118 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import count
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 import json
 
+# Per-connection tuning: NORMAL sync is safe under WAL, temp tables in RAM,
+# 256 MB mmap, 64 MB page cache, wait up to 5 s on a locked database
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+    PRAGMA busy_timeout=5000;
+"""
+
+# Cached statistics are also refreshed at least this often (seconds)
+STATISTICS_TTL = 5
+
+# Per-connection prepared statement cache size
+CACHED_STATEMENTS = 256
+
+# Most connections open at once; callers borrow one per operation
+POOL_SIZE = 4
+
+# Statements, kept as constants so each hits the statement cache
+_SQL_INSERT_PODCAST = (
+    "INSERT INTO podcasts (id, filename, original_filename, file_size, file_path, "
+    "duration, upload_date, status, content_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_UPDATE_PODCAST_STATUS = (
+    "UPDATE podcasts SET status = ?, error_message = ?, "
+    "transcript_path = COALESCE(?, transcript_path), duration = COALESCE(?, duration) "
+    "WHERE id = ?"
+)
+_SQL_GET_PODCAST = "SELECT * FROM podcasts WHERE id = ?"
+_SQL_DURATION_BY_CONTENT_HASH = (
+    "SELECT duration FROM podcasts "
+    "WHERE content_hash = ? AND file_size = ? AND duration IS NOT NULL LIMIT 1"
+)
+_SQL_RECENT_PODCASTS = "SELECT * FROM podcasts ORDER BY upload_date DESC LIMIT ?"
+_SQL_INSERT_ANALYSIS = (
+    "INSERT INTO analyses ("
+    "podcast_id, "
+    "sentiment_positive_pct, sentiment_neutral_pct, sentiment_negative_pct, "
+    "sentiment_score, dominant_tone, "
+    "tone_calm_pct, tone_aggressive_pct, tone_persuasive_pct, "
+    "tone_anxious_pct, tone_confident_pct, tone_excited_pct, "
+    "bias_score, bias_level, bias_flags_count, "
+    "processing_time, result_json_path"
+    ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_BIAS_FLAG = (
+    "INSERT INTO bias_flags (analysis_id, phrase, category, severity, "
+    "sentence, context, timestamp, timestamp_seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Totals and averages in one round trip
+_SQL_STATISTICS = (
+    "SELECT (SELECT COUNT(*) FROM podcasts), (SELECT COUNT(*) FROM analyses), "
+    "(SELECT AVG(bias_score) FROM analyses), (SELECT AVG(sentiment_score) FROM analyses)"
+)
+
+
+def _analysis_row(
+    podcast_id: str,
+    sentiment_data: Dict[str, Any],
+    tone_data: Dict[str, Any],
+    bias_data: Dict[str, Any],
+    processing_time: float,
+    result_json_path: str
+) -> tuple:
+    """Build the _SQL_INSERT_ANALYSIS parameters"""
+    return (
+        podcast_id,
+        sentiment_data.get('positive_pct', 0),
+        sentiment_data.get('neutral_pct', 0),
+        sentiment_data.get('negative_pct', 0),
+        sentiment_data.get('overall_score', 0),
+        tone_data.get('dominant_tone', 'Unknown'),
+        tone_data.get('calm_pct', 0),
+        tone_data.get('aggressive_pct', 0),
+        tone_data.get('persuasive_pct', 0),
+        tone_data.get('anxious_pct', 0),
+        tone_data.get('confident_pct', 0),
+        tone_data.get('excited_pct', 0),
+        bias_data.get('score', 0),
+        bias_data.get('level', 'Unknown'),
+        bias_data.get('flags_count', 0),
+        processing_time,
+        result_json_path
+    )
+
+
+def _bias_flag_rows(analysis_id: int, flags: List[Dict[str, Any]]):
+    """Yield _SQL_INSERT_BIAS_FLAG parameters for each flag"""
+    for flag in flags:
+        yield (
+            analysis_id,
+            flag.get('phrase', ''),
+            flag.get('category', ''),
+            flag.get('severity', 'medium'),
+            flag.get('sentence', ''),
+            flag.get('context', ''),
+            flag.get('timestamp', '00:00'),
+            flag.get('timestamp_seconds', 0.0)
+        )
+
+
 class DatabaseManager:
     """Manages all database operations for VibeJudge"""
     
@@ -12,13 +120,80 @@ class DatabaseManager:
         """
         Initialize database connection
         
+        Operations borrow a connection from a small pool, opened on demand
+        up to POOL_SIZE, and return it when done. A thread inside
+        transaction() keeps its connection for the whole block.
+        
         Args:
             db_path: Path to SQLite database file
         """
         self.db_path = db_path
-        self.connection = None
+        self._local = threading.local()  # Holds the transaction's connection
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._pool_lock = threading.Lock()
+        self._opened = 0
+        
+        # Every connection to ':memory:' is a separate database, so an
+        # in-memory database lives on a single shared connection
+        self._pool_size = 1 if db_path == ':memory:' else POOL_SIZE
+        
+        # Read caches are keyed on a version bumped by every write
+        self._versions = count(1)
+        self._write_version = 0
+        self._get_podcast_cached = lru_cache(maxsize=256)(self._fetch_podcast)
+        self._get_statistics_cached = lru_cache(maxsize=1)(self._fetch_statistics)
+        
         self._initialize_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a tuned connection"""
+        # Pooled connections move between threads, one user at a time
+        connection = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS
+        )
+        connection.row_factory = sqlite3.Row  # Return dict-like rows
+        connection.executescript(CONNECTION_PRAGMAS)
+        return connection
+    
+    def _acquire(self) -> sqlite3.Connection:
+        """Take an idle pooled connection, open one, or wait for one"""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._pool_lock:
+            can_open = self._opened < self._pool_size
+            if can_open:
+                self._opened += 1
+        
+        if not can_open:
+            return self._pool.get()
+        
+        try:
+            return self._connect()
+        except Exception:
+            with self._pool_lock:
+                self._opened -= 1
+            raise
+    
+    @contextmanager
+    def _checkout(self):
+        """Borrow a connection for one operation"""
+        # Inside transaction() every call must use the block's connection
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            yield connection
+            return
+        
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+    
     def _initialize_database(self):
         """Create database and tables if they don't exist"""
         # Read schema
@@ -26,16 +201,95 @@ class DatabaseManager:
         with open(schema_path, 'r') as f:
             schema = f.read()
         
-        # Create database
-        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.connection.row_factory = sqlite3.Row  # Return dict-like rows
+        # Create the schema before any other thread can connect, so
+        # threads never race on CREATE TABLE
+        connection = self._acquire()
+        cursor = connection.cursor()
+        
+        # WAL lets readers run alongside a writer (not applicable in memory)
+        if self.db_path != ':memory:':
+            cursor.execute("PRAGMA journal_mode=WAL")
         
-        cursor = self.connection.cursor()
         cursor.executescript(schema)
-        self.connection.commit()
+        self._migrate_schema(cursor)
+        connection.commit()
+        self._pool.put(connection)
         
         print(f"✓ Database initialized at {self.db_path}")
     
+    @contextmanager
+    def _write(self):
+        """
+        Run a write on a borrowed connection
+        
+        Commits on success and rolls back on error, so a failed statement
+        never leaves a write lock held. Inside transaction() the outer
+        block decides instead.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            yield connection
+            return
+        
+        with self._checkout() as connection:
+            try:
+                with connection:
+                    yield connection
+            finally:
+                self._invalidate()
+    
+    def _invalidate(self):
+        """Drop cached reads after a write"""
+        self._write_version = next(self._versions)
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several writes into a single commit
+        
+        Write methods called inside the block skip their own commit; all
+        of them are committed together on exit, or rolled back if the
+        block raises. A nested block becomes a savepoint, so it can roll
+        back without aborting the outer one.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.execute("SAVEPOINT nested")
+            try:
+                yield self
+            except Exception:
+                connection.execute("ROLLBACK TO nested")
+                raise
+            finally:
+                connection.execute("RELEASE nested")
+            return
+        
+        connection = self._acquire()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            self._local.connection = connection
+            try:
+                yield self
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                self._local.connection = None
+                self._invalidate()
+        finally:
+            self._pool.put(connection)
+    
+    def _migrate_schema(self, cursor: sqlite3.Cursor):
+        """Bring databases created by older schema versions up to date"""
+        columns = {row['name'] for row in cursor.execute("PRAGMA table_info(podcasts)")}
+        if 'content_hash' not in columns:
+            cursor.execute("ALTER TABLE podcasts ADD COLUMN content_hash TEXT")
+        
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_podcasts_content_hash ON podcasts(content_hash)"
+        )
+    
     def insert_podcast(
         self,
         podcast_id: str,
@@ -43,7 +297,8 @@ class DatabaseManager:
         original_filename: str,
         file_size: int,
         file_path: str,
-        duration: Optional[float] = None
+        duration: Optional[float] = None,
+        content_hash: Optional[str] = None
     ) -> bool:
         """
         Insert a new podcast record
@@ -55,29 +310,24 @@ class DatabaseManager:
             file_size: File size in bytes
             file_path: Absolute path to audio file
             duration: Audio duration in seconds (optional)
+            content_hash: SHA-256 of the file's first MiB (optional)
         
         Returns:
             True if successful
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("""
-                INSERT INTO podcasts (
-                    id, filename, original_filename, file_size, 
-                    file_path, duration, upload_date, status
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                podcast_id,
-                filename,
-                original_filename,
-                file_size,
-                file_path,
-                duration,
-                datetime.now(),
-                'uploaded'
-            ))
-            self.connection.commit()
+            with self._write() as connection:
+                connection.execute(_SQL_INSERT_PODCAST, (
+                    podcast_id,
+                    filename,
+                    original_filename,
+                    file_size,
+                    file_path,
+                    duration,
+                    datetime.now(),
+                    'uploaded',
+                    content_hash
+                ))
             print(f"✓ Podcast {podcast_id} inserted into database")
             return True
         
@@ -89,7 +339,9 @@ class DatabaseManager:
         self,
         podcast_id: str,
         status: str,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        transcript_path: Optional[str] = None,
+        duration: Optional[float] = None
     ) -> bool:
         """
         Update podcast processing status
@@ -98,18 +350,18 @@ class DatabaseManager:
             podcast_id: Podcast UUID
             status: New status (uploaded/processing/completed/failed)
             error_message: Error details if status=failed
+            transcript_path: Path to transcript JSON (kept if None)
+            duration: Audio duration in seconds (kept if None)
         
         Returns:
             True if successful
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("""
-                UPDATE podcasts 
-                SET status = ?, error_message = ?
-                WHERE id = ?
-            """, (status, error_message, podcast_id))
-            self.connection.commit()
+            with self._write() as connection:
+                connection.execute(
+                    _SQL_UPDATE_PODCAST_STATUS,
+                    (status, error_message, transcript_path, duration, podcast_id)
+                )
             return True
         
         except Exception as e:
@@ -126,14 +378,46 @@ class DatabaseManager:
         Returns:
             Dictionary with podcast data or None
         """
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT * FROM podcasts WHERE id = ?", (podcast_id,))
-        row = cursor.fetchone()
+        podcast = self._get_podcast_cached(podcast_id, self._write_version)
+        
+        # Copy so callers can't modify the cached row
+        if podcast:
+            return dict(podcast)
+        return None
+    
+    def _fetch_podcast(self, podcast_id: str, _version: int) -> Optional[Dict[str, Any]]:
+        """Read a podcast row; _version only keys the cache"""
+        with self._checkout() as connection:
+            row = connection.execute(_SQL_GET_PODCAST, (podcast_id,)).fetchone()
         
         if row:
             return dict(row)
         return None
     
+    def get_duration_by_content_hash(
+        self,
+        content_hash: str,
+        file_size: int
+    ) -> Optional[float]:
+        """
+        Look up the known duration of a previously uploaded file
+        
+        Args:
+            content_hash: SHA-256 of the file's first MiB
+            file_size: File size in bytes
+        
+        Returns:
+            Duration in seconds or None if no matching upload has one
+        """
+        with self._checkout() as connection:
+            row = connection.execute(
+                _SQL_DURATION_BY_CONTENT_HASH, (content_hash, file_size)
+            ).fetchone()
+        
+        if row:
+            return row['duration']
+        return None
+    
     def get_recent_podcasts(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get most recently uploaded podcasts
@@ -144,14 +428,10 @@ class DatabaseManager:
         Returns:
             List of podcast dictionaries
         """
-        cursor = self.connection.cursor()
-        cursor.execute("""
-            SELECT * FROM podcasts 
-            ORDER BY upload_date DESC 
-            LIMIT ?
-        """, (limit,))
-        
-        return [dict(row) for row in cursor.fetchall()]
+        with self._checkout() as connection:
+            rows = connection.execute(_SQL_RECENT_PODCASTS, (limit,)).fetchall()
+        
+        return [dict(row) for row in rows]
     
     def insert_analysis(
         self,
@@ -177,41 +457,13 @@ class DatabaseManager:
             Analysis ID if successful, None otherwise
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("""
-                INSERT INTO analyses (
-                    podcast_id,
-                    sentiment_positive_pct, sentiment_neutral_pct, sentiment_negative_pct,
-                    sentiment_score,
-                    dominant_tone,
-                    tone_calm_pct, tone_aggressive_pct, tone_persuasive_pct,
-                    tone_anxious_pct, tone_confident_pct, tone_excited_pct,
-                    bias_score, bias_level, bias_flags_count,
+            with self._write() as connection:
+                cursor = connection.execute(_SQL_INSERT_ANALYSIS, _analysis_row(
+                    podcast_id, sentiment_data, tone_data, bias_data,
                     processing_time, result_json_path
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                podcast_id,
-                sentiment_data.get('positive_pct', 0),
-                sentiment_data.get('neutral_pct', 0),
-                sentiment_data.get('negative_pct', 0),
-                sentiment_data.get('overall_score', 0),
-                tone_data.get('dominant_tone', 'Unknown'),
-                tone_data.get('calm_pct', 0),
-                tone_data.get('aggressive_pct', 0),
-                tone_data.get('persuasive_pct', 0),
-                tone_data.get('anxious_pct', 0),
-                tone_data.get('confident_pct', 0),
-                tone_data.get('excited_pct', 0),
-                bias_data.get('score', 0),
-                bias_data.get('level', 'Unknown'),
-                bias_data.get('flags_count', 0),
-                processing_time,
-                result_json_path
-            ))
+                ))
             
             analysis_id = cursor.lastrowid
-            self.connection.commit()
             
             print(f"✓ Analysis {analysis_id} inserted for podcast {podcast_id}")
             return analysis_id
@@ -236,27 +488,11 @@ class DatabaseManager:
             True if successful
         """
         try:
-            cursor = self.connection.cursor()
-            
-            for flag in flags:
-                cursor.execute("""
-                    INSERT INTO bias_flags (
-                        analysis_id, phrase, category, severity,
-                        sentence, context, timestamp, timestamp_seconds
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis_id,
-                    flag.get('phrase', ''),
-                    flag.get('category', ''),
-                    flag.get('severity', 'medium'),
-                    flag.get('sentence', ''),
-                    flag.get('context', ''),
-                    flag.get('timestamp', '00:00'),
-                    flag.get('timestamp_seconds', 0.0)
-                ))
+            with self._write() as connection:
+                connection.executemany(
+                    _SQL_INSERT_BIAS_FLAG, _bias_flag_rows(analysis_id, flags)
+                )
             
-            self.connection.commit()
             print(f"✓ {len(flags)} bias flags inserted for analysis {analysis_id}")
             return True
         
@@ -264,6 +500,60 @@ class DatabaseManager:
             print(f"✗ Error inserting bias flags: {e}")
             return False
     
+    def save_analysis_with_flags(
+        self,
+        podcast_id: str,
+        sentiment_data: Dict[str, Any],
+        tone_data: Dict[str, Any],
+        bias_data: Dict[str, Any],
+        processing_time: float,
+        result_json_path: str,
+        flags: List[Dict[str, Any]]
+    ) -> Optional[int]:
+        """
+        Insert analysis results and their bias flags in one transaction
+        
+        Args:
+            podcast_id: Associated podcast UUID
+            sentiment_data: Dictionary with sentiment metrics
+            tone_data: Dictionary with tone metrics
+            bias_data: Dictionary with bias metrics
+            processing_time: Total processing time in seconds
+            result_json_path: Path to full results JSON
+            flags: List of bias flag dictionaries
+        
+        Returns:
+            Analysis ID if successful, None otherwise (nothing is saved)
+        
+        Raises:
+            Exception: Any save error, when called inside an outer
+                transaction(), so the outer block rolls back too
+        """
+        nested = getattr(self._local, 'connection', None) is not None
+        try:
+            with self.transaction():
+                connection = self._local.connection
+                cursor = connection.execute(_SQL_INSERT_ANALYSIS, _analysis_row(
+                    podcast_id, sentiment_data, tone_data, bias_data,
+                    processing_time, result_json_path
+                ))
+                analysis_id = cursor.lastrowid
+                
+                if flags:
+                    connection.executemany(
+                        _SQL_INSERT_BIAS_FLAG, _bias_flag_rows(analysis_id, flags)
+                    )
+            
+            print(f"✓ Analysis {analysis_id} and {len(flags)} bias flags saved "
+                  f"for podcast {podcast_id}")
+            return analysis_id
+        
+        except Exception as e:
+            print(f"✗ Error saving analysis: {e}")
+            if nested:
+                raise
+            return None
+    
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get overall statistics
@@ -271,23 +561,16 @@ class DatabaseManager:
         Returns:
             Dictionary with statistics
         """
-        cursor = self.connection.cursor()
-        
-        # Total podcasts
-        cursor.execute("SELECT COUNT(*) FROM podcasts")
-        total_podcasts = cursor.fetchone()[0]
-        
-        # Total analyses
-        cursor.execute("SELECT COUNT(*) FROM analyses")
-        total_analyses = cursor.fetchone()[0]
-        
-        # Average bias score
-        cursor.execute("SELECT AVG(bias_score) FROM analyses")
-        avg_bias = cursor.fetchone()[0] or 0
-        
-        # Average sentiment score
-        cursor.execute("SELECT AVG(sentiment_score) FROM analyses")
-        avg_sentiment = cursor.fetchone()[0] or 0
+        ttl_bucket = int(time.monotonic() // STATISTICS_TTL)
+        return dict(self._get_statistics_cached(self._write_version, ttl_bucket))
+    
+    def _fetch_statistics(self, _version: int, _ttl_bucket: int) -> Dict[str, Any]:
+        """Compute statistics; the arguments only key the cache"""
+        with self._checkout() as connection:
+            row = connection.execute(_SQL_STATISTICS).fetchone()
+        total_podcasts, total_analyses, avg_bias, avg_sentiment = row
+        avg_bias = avg_bias or 0
+        avg_sentiment = avg_sentiment or 0
         
         return {
             'total_podcasts': total_podcasts,
@@ -297,9 +580,20 @@ class DatabaseManager:
         }
     
     def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
+        """Close all idle database connections"""
+        closed = 0
+        while True:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+            closed += 1
+        
+        with self._pool_lock:
+            self._opened -= closed
+        
+        if closed:
             print("✓ Database connection closed")
 
 
@@ -7,6 +7,10 @@ BASE_DIR = Path(__file__).parent.parent
 DB_PATH = BASE_DIR / "vibejudge.db"
 SCHEMA_PATH = BASE_DIR / "database" / "schema.sql"
 
+# journal_mode is persisted in the database file, so it only needs setting
+# once here; per-connection pragmas live in CONNECTION_PRAGMAS in db_manager.py
+PRAGMAS = "PRAGMA journal_mode=WAL;"
+
 def init_db():
     print(f"Initializing database at: {DB_PATH}")
     
@@ -23,6 +27,9 @@ def init_db():
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
+        # Create the file in WAL mode from the first connection
+        cursor.executescript(PRAGMAS)
+        
         # Execute script
         cursor.executescript(schema_sql)
         print("Schema executed successfully.")
@@ -10,7 +10,8 @@ CREATE TABLE IF NOT EXISTS podcasts (
     file_path TEXT,                         -- Path to audio file
     transcript_path TEXT,                   -- Path to transcript JSON
     status TEXT DEFAULT 'uploaded',         -- uploaded/processing/completed/failed
-    error_message TEXT                      -- If status=failed
+    error_message TEXT,                     -- If status=failed
+    content_hash TEXT                       -- SHA-256 of first MiB, for duration reuse
 );
 
 -- Analyses table: stores complete analysis results
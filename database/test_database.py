@@ -12,7 +12,8 @@ success = db.insert_podcast(
     original_filename="My Podcast Episode 1.mp3",
     file_size=15000000,  # 15 MB
     file_path="/data/uploads/test_podcast.mp3",
-    duration=900.0  # 15 minutes
+    duration=900.0,  # 15 minutes
+    content_hash="0" * 64
 )
 
 print(f"\n1. Insert podcast: {'✓ Success' if success else '✗ Failed'}")
@@ -28,10 +29,31 @@ if podcast:
 success = db.update_podcast_status(test_id, "processing")
 print(f"3. Update status: {'✓ Success' if success else '✗ Failed'}")
 
-# Test 4: Get statistics
+# Test 4: Duration lookup by content hash
+duration = db.get_duration_by_content_hash("0" * 64, 15000000)
+print(f"4. Duration by content hash: {'✓ Success' if duration == 900.0 else '✗ Failed'}")
+
+# Test 5: Get statistics
 stats = db.get_statistics()
-print(f"4. Statistics:")
+print(f"5. Statistics:")
 print(f"   - Total podcasts: {stats['total_podcasts']}")
 print(f"   - Total analyses: {stats['total_analyses']}")
 
+# Test 6: Columnar (numpy) timeline through the cached chart and report builders
+import numpy as np
+from app.main import _cached_sentiment_timeline, _json_report_bytes
+
+columns = {
+    "time_label": np.array(["0:00", "0:30"]),
+    "avg_sentiment": np.array([0.25, -0.5])
+}
+try:
+    figure = _cached_sentiment_timeline(columns)
+    report = _json_report_bytes(test_id, "test_podcast.mp3", {}, {"timeline": columns}, {})
+    success = figure is not None and b'"0:30"' in report
+except Exception as e:
+    print(f"   - Error: {e}")
+    success = False
+print(f"6. Columnar timeline caching: {'✓ Success' if success else '✗ Failed'}")
+
 print("\n✓ Database tests completed!")
\ No newline at end of file
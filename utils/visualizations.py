@@ -1,33 +1,85 @@
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
 import numpy as np
-from typing import Dict, List
+import copy
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple, Union
 
+# Timelines arrive as a list of bins or as a dict of columns
+Timeline = Union[List[Dict], Dict[str, List]]
 
-def create_sentiment_timeline(timeline_data: List[Dict]) -> go.Figure:
+_SENTIMENT_LABELS = ('Positive', 'Neutral', 'Negative')
+_SENTIMENT_COLORS = ('#2ecc71', '#95a5a6', '#e74c3c')
+
+# Tone to numeric mapping
+_TONE_MAP = {
+    "calm": 0,
+    "confident": 1,
+    "persuasive": 2,
+    "excited": 3,
+    "anxious": 4,
+    "aggressive": 5
+}
+
+# Sorted vocabulary and matching codes for vectorized tone lookups
+_TONE_VOCABULARY = np.array(sorted(_TONE_MAP))
+_TONE_CODES = np.array([_TONE_MAP[t] for t in _TONE_VOCABULARY], dtype=np.int8)
+
+_TONE_COLORSCALE = (
+    (0, '#3498db'),     # Calm - Blue
+    (0.2, '#2ecc71'),   # Confident - Green
+    (0.4, '#f39c12'),   # Persuasive - Orange
+    (0.6, '#9b59b6'),   # Excited - Purple
+    (0.8, '#e67e22'),   # Anxious - Dark Orange
+    (1, '#e74c3c')      # Aggressive - Red
+)
+
+
+def _columns(timeline: Optional[Timeline], *keys: str) -> Optional[Tuple]:
+    """
+    Pull columns out of a timeline in either layout
+    
+    Args:
+        timeline: List of bin dicts, or a dict mapping each key to a column
+        keys: Column names to extract (at least two)
+    
+    Returns:
+        One sequence per key, or None if the timeline is empty
+    """
+    if isinstance(timeline, dict):
+        columns = tuple(timeline.get(key, ()) for key in keys)
+        return columns if len(columns[0]) else None
+    
+    if not timeline:
+        return None
+    
+    # itemgetter builds each row tuple in C, zip transposes in one pass
+    return tuple(zip(*map(itemgetter(*keys), timeline)))
+
+
+def create_sentiment_timeline(timeline_data: Timeline) -> go.Figure:
     """
     Create sentiment timeline chart
     
     Args:
-        timeline_data: List of timeline bins with sentiment scores
+        timeline_data: Timeline bins (or columns) with sentiment scores
     
     Returns:
         Plotly figure object
     """
-    if not timeline_data:
+    columns = _columns(timeline_data, "time_label", "avg_sentiment")
+    if columns is None:
         return _empty_figure("No timeline data available")
     
-    time_labels = [bin["time_label"] for bin in timeline_data]
-    sentiment_scores = [bin["avg_sentiment"] for bin in timeline_data]
+    time_labels, sentiment_scores = columns
     
-    # Color mapping
-    colors = [
-        '#2ecc71' if score > 0.2 else  # Green for positive
-        '#e74c3c' if score < -0.2 else  # Red for negative
-        '#95a5a6'  # Gray for neutral
-        for score in sentiment_scores
-    ]
+    # Color mapping: green for positive, red for negative, gray for neutral
+    scores = np.asarray(sentiment_scores, dtype=float)
+    colors = np.select(
+        [scores > 0.2, scores < -0.2],
+        ['#2ecc71', '#e74c3c'],
+        default='#95a5a6'
+    ).tolist()
     
     fig = go.Figure()
     
@@ -74,13 +126,13 @@ def create_sentiment_distribution_pie(sentiment_results: Dict) -> go.Figure:
     Returns:
         Plotly figure object
     """
-    labels = ['Positive', 'Neutral', 'Negative']
+    labels = _SENTIMENT_LABELS
     values = [
         sentiment_results['positive_ratio'] * 100,
         sentiment_results['neutral_ratio'] * 100,
         sentiment_results['negative_ratio'] * 100
     ]
-    colors = ['#2ecc71', '#95a5a6', '#e74c3c']
+    colors = _SENTIMENT_COLORS
     
     fig = go.Figure(data=[go.Pie(
         labels=labels,
@@ -100,54 +152,39 @@ def create_sentiment_distribution_pie(sentiment_results: Dict) -> go.Figure:
     return fig
 
 
-def create_tone_heatmap(tone_timeline: List[Dict]) -> go.Figure:
+def create_tone_heatmap(tone_timeline: Timeline) -> go.Figure:
     """
     Create heatmap showing tone changes over time
     
     Args:
-        tone_timeline: Tone timeline data
+        tone_timeline: Tone timeline bins (or columns)
     
     Returns:
         Plotly figure object
     """
-    if not tone_timeline:
+    columns = _columns(tone_timeline, "time_label", "dominant_tone")
+    if columns is None:
         return _empty_figure("No tone timeline data available")
     
-    # Extract data
-    time_labels = [bin["time_label"] for bin in tone_timeline]
-    tones = [bin["dominant_tone"] for bin in tone_timeline]
-    
-    # Tone to numeric mapping
-    tone_map = {
-        "calm": 0,
-        "confident": 1,
-        "persuasive": 2,
-        "excited": 3,
-        "anxious": 4,
-        "aggressive": 5
-    }
-    
-    tone_values = [tone_map.get(t, 0) for t in tones]
+    time_labels, tones = columns
     
-    # Color scale
-    colorscale = [
-        [0, '#3498db'],     # Calm - Blue
-        [0.2, '#2ecc71'],   # Confident - Green
-        [0.4, '#f39c12'],   # Persuasive - Orange
-        [0.6, '#9b59b6'],   # Excited - Purple
-        [0.8, '#e67e22'],   # Anxious - Dark Orange
-        [1, '#e74c3c']      # Aggressive - Red
-    ]
+    # Vectorized lookup: binary search into the sorted vocabulary,
+    # unknown tones fall back to calm (0)
+    tone_array = np.asarray(tones, dtype=str)
+    positions = np.searchsorted(_TONE_VOCABULARY, tone_array).clip(max=len(_TONE_VOCABULARY) - 1)
+    tone_values = np.where(
+        _TONE_VOCABULARY[positions] == tone_array, _TONE_CODES[positions], 0
+    )
     
     fig = go.Figure(data=go.Heatmap(
         z=[tone_values],
         x=time_labels,
         y=['Tone'],
-        colorscale=colorscale,
+        colorscale=_TONE_COLORSCALE,
         showscale=False,
+        customdata=[tones],
         hovertemplate='<b>Time:</b> %{x}<br>' +
-                      '<b>Tone:</b> ' + 
-                      np.array(tones)[np.newaxis, :].tolist()[0] +
+                      '<b>Tone:</b> %{customdata}' +
                       '<extra></extra>'
     ))
     
@@ -191,10 +228,9 @@ def create_combined_dashboard(
     )
     
     # 1. Sentiment Timeline (row 1, col 1)
-    if sentiment_results.get("timeline"):
-        timeline = sentiment_results["timeline"]
-        time_labels = [bin["time_label"] for bin in timeline]
-        sentiment_scores = [bin["avg_sentiment"] for bin in timeline]
+    timeline = _columns(sentiment_results.get("timeline"), "time_label", "avg_sentiment")
+    if timeline is not None:
+        time_labels, sentiment_scores = timeline
         
         fig.add_trace(
             go.Scatter(
@@ -208,13 +244,13 @@ def create_combined_dashboard(
         )
     
     # 2. Sentiment Pie (row 1, col 2)
-    sentiment_labels = ['Positive', 'Neutral', 'Negative']
+    sentiment_labels = _SENTIMENT_LABELS
     sentiment_values = [
         sentiment_results['positive_ratio'] * 100,
         sentiment_results['neutral_ratio'] * 100,
         sentiment_results['negative_ratio'] * 100
     ]
-    sentiment_colors = ['#2ecc71', '#95a5a6', '#e74c3c']
+    sentiment_colors = _SENTIMENT_COLORS
     
     fig.add_trace(
         go.Pie(
@@ -279,21 +315,28 @@ def create_combined_dashboard(
     return fig
 
 
+# Plain-dict spec for _empty_figure. Not Figure.to_dict(): that embeds
+# the whole default template, which is far slower to copy and rebuild
+_EMPTY_FIG_TEMPLATE = {
+    'layout': {
+        'annotations': [dict(
+            text="",
+            xref="paper",
+            yref="paper",
+            x=0.5,
+            y=0.5,
+            showarrow=False,
+            font=dict(size=16, color="gray")
+        )],
+        'xaxis': dict(showticklabels=False, showgrid=False),
+        'yaxis': dict(showticklabels=False, showgrid=False),
+        'height': 400
+    }
+}
+
+
 def _empty_figure(message: str) -> go.Figure:
     """Create empty figure with message"""
-    fig = go.Figure()
-    fig.add_annotation(
-        text=message,
-        xref="paper",
-        yref="paper",
-        x=0.5,
-        y=0.5,
-        showarrow=False,
-        font=dict(size=16, color="gray")
-    )
-    fig.update_layout(
-        xaxis=dict(showticklabels=False, showgrid=False),
-        yaxis=dict(showticklabels=False, showgrid=False),
-        height=400
-    )
-    return fig
+    spec = copy.deepcopy(_EMPTY_FIG_TEMPLATE)
+    spec['layout']['annotations'][0]['text'] = message
+    return go.Figure(spec, skip_invalid=True)